@@ -4,6 +4,7 @@ from __future__ import division
 
 import os
 import json
+import stat
 import shutil
 import subprocess
 
@@ -17,6 +18,7 @@ from honeybee_energy.result.emissions import emissions_region
 from .config import folders
 from .measure import MapperMeasure
 from .reopt import REoptParameter
+from .writer import _write_json
 
 # Custom environment used to run Python packages without conflicts
 PYTHON_ENV = os.environ.copy()
@@ -25,6 +27,9 @@ PYTHON_ENV['PYTHONHOME'] = ''
 # Number to prevent GHE Designer simulations that would max out the memory
 MAX_BOREHOLES = 10000
 
+# Order in which the different types of measures are run in a workflow
+MEASURE_ORDER = {'ModelMeasure': 0, 'EnergyPlusMeasure': 1, 'ReportingMeasure': 2}
+
 
 def base_honeybee_osw(
         project_directory, sim_par_json=None, additional_measures=None,
@@ -106,6 +111,7 @@ def base_honeybee_osw(
         osw_dict['measure_paths'].append(m_dir)
 
     # add the emissions reporting if a year has been selected
+    epw_obj = None  # the EPW is parsed once and only if it is needed
     if emissions_year is not None and epw_file is not None:
         epw_obj = EPW(epw_file)
         ems_region = emissions_region(epw_obj.location)
@@ -136,11 +142,7 @@ def base_honeybee_osw(
             measures.extend(additional_mapper_measures)
         measure_paths = set()  # set of all unique measure paths
         # ensure measures are correctly ordered
-        m_dict = {'ModelMeasure': [], 'EnergyPlusMeasure': [], 'ReportingMeasure': []}
-        for measure in measures:
-            m_dict[measure.type].append(measure)
-        sorted_measures = m_dict['ModelMeasure'] + m_dict['EnergyPlusMeasure'] + \
-            m_dict['ReportingMeasure']
+        sorted_measures = sorted(measures, key=lambda m: MEASURE_ORDER[m.type])
         for measure in sorted_measures:
             measure.validate()  # ensure that all required arguments have values
             measure_paths.add(os.path.dirname(measure.folder))
@@ -151,8 +153,8 @@ def base_honeybee_osw(
             osw_dict['measure_paths'].append(m_path)
 
     # add default feature reports if they aren't in the steps
-    all_measures = [step['measure_dir_name'] for step in osw_dict['steps']]
-    if 'default_feature_reports' not in all_measures:
+    step_dict = {step.get('measure_dir_name'): step for step in osw_dict['steps']}
+    if 'default_feature_reports' not in step_dict:
         report_measure_dict = {
             'arguments': {
                 'feature_id': None,
@@ -171,45 +173,36 @@ def base_honeybee_osw(
         osw_dict['weather_file'] = epw_file
         sys_param_file = os.path.join(project_directory, 'system_params.json')
         if os.path.isfile(sys_param_file):
-            # make sure the Modelica measure runs as part of the simulation
-            modelica_measures = [
-                {
-                    'measure_dir_name': 'export_time_series_modelica',
-                    'arguments': {'__SKIP__': False}
-                },
-                {
-                    'measure_dir_name': 'export_modelica_loads',
-                    'arguments': {'__SKIP__': False}
-                },
-            ]
-            osw_dict['steps'].extend(modelica_measures)
+            # make sure the Modelica measures run as part of the simulation
+            for m_name in ('export_time_series_modelica', 'export_modelica_loads'):
+                if m_name in step_dict:  # make sure the existing step is not skipped
+                    step_dict[m_name].setdefault('arguments', {})['__SKIP__'] = False
+                else:
+                    modelica_measure = {
+                        'measure_dir_name': m_name,
+                        'arguments': {'__SKIP__': False}
+                    }
+                    osw_dict['steps'].append(modelica_measure)
 
             # copy the EPW to the project directory
             epw_f_name = os.path.split(epw_file)[-1]
             target_epw = os.path.join(project_directory, epw_f_name)
-            shutil.copy(epw_file, target_epw)
+            shutil.copyfile(epw_file, target_epw)
             # create a MOS file from the EPW
-            epw_obj = EPW(target_epw)
+            if epw_obj is None:
+                epw_obj = EPW(epw_file)
             mos_file = os.path.join(
                 project_directory, epw_f_name.replace('.epw', '.mos'))
             epw_obj.to_mos(mos_file)
             # find the path to the feature GeoJSON
-            feature_geojson = None
-            for fp in os.listdir(project_directory):
-                if fp.endswith('.geojson'):
-                    feature_geojson = os.path.join(project_directory, fp)
-                    break
-            if not feature_geojson:
-                raise ValueError(
-                    'No feature geojson file was found in: {}'.format(project_directory))
+            feature_geojson = _find_feature_geojson(project_directory)
             # write the EPW path into the GeoJSON
             with open(feature_geojson, 'r') as gjf:
                 geo_dict = json.load(gjf)
             if 'project' in geo_dict:
                 if 'weather_filename' not in geo_dict['project']:
                     geo_dict['project']['weather_filename'] = epw_f_name
-                    with open(feature_geojson, 'w') as fp:
-                        json.dump(geo_dict, fp, indent=4)
+                    _write_json(feature_geojson, geo_dict, indent=4)
 
             # if the DES system is GSHP, specify any autocalculated ground temperatures
             with open(sys_param_file, 'r') as spf:
@@ -220,23 +213,20 @@ def base_honeybee_osw(
                     if 'soil' in g5_par and 'undisturbed_temp' in g5_par['soil']:
                         soil_par = g5_par['soil']
                         if soil_par['undisturbed_temp'] == 'Autocalculate':
-                            epw_obj = EPW(epw_file)
                             soil_par['undisturbed_temp'] = \
                                 epw_obj.dry_bulb_temperature.average
-                            with open(sys_param_file, 'w') as fp:
-                                json.dump(sys_dict, fp, indent=4)
+                            _write_json(sys_param_file, sys_dict, indent=4)
 
     # write the dictionary to a honeybee_workflow.osw
     mappers_dir = os.path.join(project_directory, 'mappers')
     if not os.path.isdir(mappers_dir):
         preparedir(mappers_dir)
     osw_json = os.path.join(mappers_dir, 'honeybee_workflow.osw')
-    with open(osw_json, 'w') as fp:
-        json.dump(osw_dict, fp, indent=4)
+    _write_json(osw_json, osw_dict)
 
     # copy the Honeybee.rb mapper if it exists in the config
     if folders.mapper_path:
-        shutil.copy(folders.mapper_path, os.path.join(mappers_dir, 'Honeybee.rb'))
+        shutil.copyfile(folders.mapper_path, os.path.join(mappers_dir, 'Honeybee.rb'))
 
     return os.path.abspath(osw_json)
 
@@ -270,7 +260,7 @@ def prepare_urbanopt_folder(feature_geojson, cpu_count=None, verbose=False):
         'This file must exist to run URBANopt.'
     folders.check_urbanopt_version()
     uo_folder = os.path.dirname(feature_geojson)
-    shutil.copy(folders.urbanopt_gemfile_path, os.path.join(uo_folder, 'Gemfile'))
+    shutil.copyfile(folders.urbanopt_gemfile_path, os.path.join(uo_folder, 'Gemfile'))
 
     # auto-assign the number of processors if None
     cpu_count = _recommended_processor_count() if cpu_count is None else cpu_count
@@ -284,8 +274,7 @@ def prepare_urbanopt_folder(feature_geojson, cpu_count=None, verbose=False):
         'verbose': verbose
     }
     runner_conf = os.path.join(uo_folder, 'runner.conf')
-    with open(runner_conf, 'w') as fp:
-        json.dump(runner_dict, fp, indent=2)
+    _write_json(runner_conf, runner_dict)
 
     # generate the scenario csv file
     return _make_scenario(feature_geojson)
@@ -422,8 +411,7 @@ def run_reopt(feature_geojson, scenario_csv, urdb_label, reopt_parameters=None,
     reopt_par_json = os.path.join(reopt_folder, 'reopt_assumptions.json')
     reopt_dict = reopt_parameters.to_assumptions_dict(
         folders.reopt_assumptions_path, urdb_label)
-    with open(reopt_par_json, 'w') as fp:
-        json.dump(reopt_dict, fp, indent=4)
+    _write_json(reopt_par_json, reopt_dict)
 
     # run the simulation
     if os.name == 'nt':  # we are on Windows
@@ -475,8 +463,7 @@ def run_rnm(feature_geojson, scenario_csv, underground_ratio=0.9, lv_only=True,
             geo_dict['project']['only_lv_consumers'] = lv_only
             geo_dict['project']['max_number_of_lv_nodes_per_building'] = \
                 nodes_per_building
-            with open(feature_geojson, 'w') as fp:
-                json.dump(geo_dict, fp, indent=4)
+            _write_json(feature_geojson, geo_dict, indent=4)
     # run the simulation
     folders.check_urbanopt_version()
     if os.name == 'nt':  # we are on Windows
@@ -492,8 +479,7 @@ def run_rnm(feature_geojson, scenario_csv, underground_ratio=0.9, lv_only=True,
         with open(rnm_geojson, 'r') as fg:
             rnm_dict = json.load(fg)
         rnm_dict['project'] = project_dict
-        with open(rnm_geojson, 'w') as fp:
-            json.dump(rnm_dict, fp, indent=4)
+        _write_json(rnm_geojson, rnm_dict, indent=4)
         return rnm_path
 
 
@@ -522,21 +508,14 @@ def run_des_sys_param(feature_geojson, scenario_csv):
 
     # run the command that adds the building loads to the system parameter
     ext = '.exe' if os.name == 'nt' else ''
-    shell = True if os.name == 'nt' else False
     uo_des_exe = os.path.join(
         hb_folders.python_scripts_path, 'uo_des{}'.format(ext))
-    build_cmd = '"{des_exe}" build-sys-param ' \
-        '"{sp_file}" "{scenario}" "{feature}" '.format(
-            des_exe=uo_des_exe, sp_file=sys_param_file,
-            scenario=scenario_csv, feature=feature_geojson)
-    if ghe_sys:
-        build_cmd = '{} 5G_ghe'.format(build_cmd)
-    else:
-        build_cmd = '{} 4G'.format(build_cmd)
-    build_cmd = '{} time_series -o'.format(build_cmd)
-    process = subprocess.Popen(
-        build_cmd, stderr=subprocess.PIPE, shell=shell, env=PYTHON_ENV
-    )
+    des_type = '5G_ghe' if ghe_sys else '4G'
+    build_cmd = [
+        uo_des_exe, 'build-sys-param', sys_param_file, scenario_csv,
+        feature_geojson, des_type, 'time_series', '-o'
+    ]
+    process = subprocess.Popen(build_cmd, stderr=subprocess.PIPE, env=PYTHON_ENV)
     stderr = process.communicate()
     if not os.path.isfile(sys_param_file):
         msg = 'Failed to add building loads to the DES system parameter file.\n' \
@@ -553,22 +532,19 @@ def run_des_sys_param(feature_geojson, scenario_csv):
         original_des_par = des_dict['fifth_generation']
         original_ghe_par = original_des_par['ghe_parameters']
         des_par = sp_dict['district_system']['fifth_generation']
+        ghe_par = des_par['ghe_parameters']
         des_par['soil'] = original_des_par['soil']
-        des_par['ghe_parameters']['fluid'] = original_ghe_par['fluid']
-        des_par['ghe_parameters']['grout'] = original_ghe_par['grout']
-        des_par['ghe_parameters']['pipe'] = original_ghe_par['pipe']
-        des_par['ghe_parameters']['geometric_constraints'] = \
-            original_ghe_par['geometric_constraints']
-        des_par['ghe_parameters']['ghe_specific_params'] = \
-            original_ghe_par['ghe_specific_params']
+        for key in ('fluid', 'grout', 'pipe', 'geometric_constraints',
+                    'ghe_specific_params'):
+            ghe_par[key] = original_ghe_par[key]
         # remove geometric params so that ThermalNetwork uses GeoJSON polygon
         rect_geo_par = []
-        for ghe_dict in des_par['ghe_parameters']['ghe_specific_params']:
+        for ghe_dict in ghe_par['ghe_specific_params']:
             rect_geo_par.append(ghe_dict.pop('ghe_geometric_params'))
     else:
         sp_dict['district_system'] = des_dict
-    with open(sys_param_file, 'w') as spf:
-        json.dump(sp_dict, spf, indent=2)
+    # the GHE sizing rewrites the file so only indent the final version
+    _write_json(sys_param_file, sp_dict, indent=None if ghe_sys else 2)
 
     # if the DES system has a ground heat exchanger, run the thermal network package
     if ghe_sys:
@@ -578,26 +554,26 @@ def run_des_sys_param(feature_geojson, scenario_csv):
         scn_name = os.path.basename(scenario_csv).replace('.csv', '')
         scn_dir = os.path.join(directory, 'run', scn_name)
         ghe_dir = os.path.join(scn_dir, 'ghe_dir')
-        build_cmd = \
-            '"{tn_exe}" -y "{sp_file}" -s "{scenario}" -f "{feature}" -o {out_p}'.format(
-                tn_exe=tn_exe, sp_file=sys_param_file,
-                scenario=scn_dir, feature=feature_geojson, out_p=ghe_dir)
-        process = subprocess.Popen(
-            build_cmd, stderr=subprocess.PIPE, shell=False, env=PYTHON_ENV
-        )
+        build_cmd = [
+            tn_exe, '-y', sys_param_file, '-s', scn_dir,
+            '-f', feature_geojson, '-o', ghe_dir
+        ]
+        process = subprocess.Popen(build_cmd, stderr=subprocess.PIPE, env=PYTHON_ENV)
         # if any errors were found in the sizing simulation, raise them to the user
         stderr = process.communicate()[1]
         stderr_str = str(stderr.strip())
         print(stderr_str)
         if 'ValueError' in stderr_str:  # pass the exception onto the user
-            msg = stderr_str.split('ValueError: ')[-1].strip()
-            raise ValueError(msg)
+            err_i = stderr_str.rfind('ValueError: ')
+            msg = stderr_str[err_i + len('ValueError: '):] \
+                if err_i != -1 else stderr_str
+            raise ValueError(msg.strip())
         # add the borehole length and count to the system parameter file
         with open(sys_param_file, 'r') as spf:
             sp_dict = json.load(spf)
         ghe_par_dict = sp_dict['district_system']['fifth_generation']['ghe_parameters']
+        r_dir = ghe_par['ghe_dir']
         for ghe_s_par, rect_par in zip(ghe_par_dict['ghe_specific_params'], rect_geo_par):
-            r_dir = des_par['ghe_parameters']['ghe_dir']
             res_file = os.path.join(r_dir, ghe_s_par['ghe_id'], 'SimulationSummary.json')
             with open(res_file, 'r') as rf:
                 res_dict = json.load(rf)
@@ -606,8 +582,7 @@ def run_des_sys_param(feature_geojson, scenario_csv):
             ghe_s_par['borehole']['number_of_boreholes'] = \
                 res_dict['ghe_system']['number_of_boreholes']
             ghe_s_par['ghe_geometric_params'] = rect_par
-        with open(sys_param_file, 'w') as spf:
-            json.dump(sp_dict, spf, indent=2)
+        _write_json(sys_param_file, sp_dict, indent=2)
     return sys_param_file
 
 
@@ -673,10 +648,7 @@ def _add_mapper_measure(project_directory, mapper_measure):
         mapper_measure: A MapperMeasure object to add.
     """
     # find the feature geoJSON and parse in the dictionary
-    for proj_file in os.listdir(project_directory):
-        if proj_file.endswith('geojson'):
-            geojson_file = os.path.join(project_directory, proj_file)
-            break
+    geojson_file = _find_feature_geojson(project_directory)
     with open(geojson_file, 'r') as base_file:
         geojson_dict = json.load(base_file)
 
@@ -689,32 +661,51 @@ def _add_mapper_measure(project_directory, mapper_measure):
     else:
         map_meas_list = []
 
-    # loop through the mapper measure and assign any mapper arguments
-    for m_arg in mapper_measure.arguments:
-        if isinstance(m_arg.value, tuple):  # argument to map to buildings
-            for i, feat in enumerate(geojson_dict['features']):
-                try:
-                    if feat['properties']['type'] == 'Building':
-                        feat['properties'][m_arg.identifier] = m_arg.value[i]
-                except IndexError:
-                    raise ValueError(
-                        'Number of MapperMeasure arguments ({}) does not equal the '
-                        'number of buildings in the model ({}).'.format(
-                            len(m_arg.value), len(geojson_dict['features'])))
-                except KeyError:  # definitely not a building
-                    pass
-            m_arg_info = [
-                os.path.basename(mapper_measure.folder),
-                m_arg.identifier, m_arg.identifier]
-            map_meas_list.append(m_arg_info)
+    # get the properties of all building features to which arguments can be mapped
+    bldg_props = []
+    for feat in geojson_dict['features']:
+        props = feat.get('properties')
+        if props is not None and props.get('type') == 'Building':
+            bldg_props.append(props)
+
+    # gather and check the mapper arguments to be assigned to the buildings
+    map_args = [m_arg for m_arg in mapper_measure.arguments
+                if isinstance(m_arg.value, tuple)]
+    for m_arg in map_args:
+        if len(m_arg.value) != len(bldg_props):
+            raise ValueError(
+                'Number of MapperMeasure arguments ({}) does not equal the '
+                'number of buildings in the model ({}).'.format(
+                    len(m_arg.value), len(bldg_props)))
+        m_arg_info = [
+            os.path.basename(mapper_measure.folder),
+            m_arg.identifier, m_arg.identifier]
+        map_meas_list.append(m_arg_info)
+
+    # assign all of the mapper arguments to each building in a single pass
+    for i, props in enumerate(bldg_props):
+        for m_arg in map_args:
+            props[m_arg.identifier] = m_arg.value[i]
 
     # write the geoJSON and the mapper_measures.json
     if not os.path.isdir(mapper_dir):
         os.mkdir(mapper_dir)
-    with open(geojson_file, 'w') as fp:
-        json.dump(geojson_dict, fp, indent=4)
-    with open(map_meas_file, 'w') as fp:
-        json.dump(map_meas_list, fp, indent=4)
+    _write_json(geojson_file, geojson_dict, indent=4)
+    _write_json(map_meas_file, map_meas_list, indent=4)
+
+
+def _find_feature_geojson(project_directory):
+    """Get the path to the first feature geoJSON found in a project directory.
+
+    Args:
+        project_directory: Full path to a folder out of which the URBANopt simulation
+            will be run. This is the folder that contains the feature geoJSON.
+    """
+    for proj_file in os.listdir(project_directory):
+        if proj_file.endswith('.geojson'):
+            return os.path.join(project_directory, proj_file)
+    raise ValueError(
+        'No feature geojson file was found in: {}'.format(project_directory))
 
 
 def _make_scenario(feature_geojson):
@@ -731,20 +722,16 @@ def _make_scenario(feature_geojson):
     scenario_matrix = [['Feature Id', 'Feature Name', 'Mapper Class']]
     hb_mapper = 'URBANopt::Scenario::HoneybeeMapper'
     for feature in geo_dict['features']:
-        try:
-            if feature['properties']['type'] == 'Building':
-                props = feature['properties']
-                f_row = [props['id'], props['name'], hb_mapper]
-                scenario_matrix.append(f_row)
-        except KeyError:  # definitely not a building
-            pass
+        props = feature.get('properties')
+        if props is not None and props.get('type') == 'Building':
+            f_row = [props['id'], props['name'], hb_mapper]
+            scenario_matrix.append(f_row)
 
     # write the scenario CSV file
     uo_folder = os.path.dirname(feature_geojson)
     scenario = os.path.join(uo_folder, 'honeybee_scenario.csv')
     with open(scenario, 'w') as fp:
-        for row in scenario_matrix:
-            fp.write('{}\n'.format(','.join(row)))
+        fp.write(''.join('{}\n'.format(','.join(row)) for row in scenario_matrix))
     return scenario
 
 
@@ -827,19 +814,45 @@ def _run_urbanopt_unix(feature_geojson, scenario_csv):
     shell = '#!/usr/bin/env bash\nsource "{}"\nuo run -f "{}" -s "{}"'.format(
         folders.urbanopt_env_path, feature_geojson, scenario_csv)
     shell_file = os.path.join(directory, 'run_simulation.sh')
-    write_to_file(shell_file, shell, True)
-    # make the shell script executable using subprocess.check_call
-    # this is more reliable than native Python chmod on Mac
-    subprocess.check_call(['chmod', 'u+x', shell_file])
+    _write_executable(shell_file, shell)
     # run the shell script
-    process = subprocess.Popen(
-        '"{}"'.format(shell_file), stderr=subprocess.PIPE, env=PYTHON_ENV, shell=True
-    )
+    process = subprocess.Popen([shell_file], stderr=subprocess.PIPE, env=PYTHON_ENV)
     result = process.communicate()
     stderr = result[1]
     return directory, stderr
 
 
+def _write_executable(file_path, contents):
+    """Write a shell script to a file and make sure that it is executable.
+
+    New files are created with executable permissions. If an existing file lacks
+    them, the user execute bit is set with os.chmod and a separate chmod process
+    is only used as a fallback. Existing files that already have the same
+    contents are not rewritten.
+
+    Args:
+        file_path: The full path to the shell script to be written.
+        contents: Text for the contents of the shell script.
+    """
+    contents = contents.encode('utf-8')
+    if os.path.isfile(file_path):
+        with open(file_path, 'rb') as sf:
+            existing = sf.read()
+    else:
+        existing = None
+    if existing != contents:
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+        try:
+            os.write(fd, contents)
+        finally:
+            os.close(fd)
+    if not os.access(file_path, os.X_OK):
+        os.chmod(file_path, os.stat(file_path).st_mode | stat.S_IXUSR)
+        if not os.access(file_path, os.X_OK):
+            # fall back to the chmod command when os.chmod did not take effect
+            subprocess.check_call(['chmod', 'u+x', file_path])
+
+
 def _check_urbanopt_file(feature_geojson, scenario_csv):
     """Prepare an OSW file to be run through URBANopt CLI.
 
@@ -860,6 +873,16 @@ def _check_urbanopt_file(feature_geojson, scenario_csv):
     return os.path.split(feature_geojson)[0]
 
 
+def _scenario_result_folder(scenario_csv):
+    """Get the name of the folder where URBANopt writes the results of a scenario.
+
+    Args:
+        scenario_csv: The full path to a .csv file for the URBANopt scenario.
+    """
+    scenario_name = os.path.basename(scenario_csv).lower()
+    return scenario_name[:-4] if scenario_name.endswith('.csv') else scenario_name
+
+
 def _output_urbanopt_files(directory, stderr=''):
     """Get the paths to the simulation output files given the urbanopt directory.
 
@@ -913,36 +936,29 @@ def _output_urbanopt_files(directory, stderr=''):
             geo_dict = json.load(base_file)
         bldg_names = []
         for ft in geo_dict['features']:
-            if 'properties' in ft and 'type' in ft['properties']:
-                if ft['properties']['type'] == 'Building' and 'id' in ft['properties']:
-                    bldg_names.append(ft['properties']['id'])
+            props = ft.get('properties')
+            if props is not None and props.get('type') == 'Building' and 'id' in props:
+                bldg_names.append(props['id'])
     else:
         bldg_names = os.listdir(sim_dir)
 
-    # generate paths to the simulation files and check their existence
+    # map the names of the simulation files to the lists that collect them
+    result_lists = {
+        'in.osm': osm, 'in.idf': idf, 'eplusout.sql': sql, 'epluszsz.csv': zsz,
+        'eplusout.rdd': rdd, 'eplustbl.htm': html, 'eplusout.err': err
+    }
+
+    # list each building folder once and collect the simulation files within it
     for bldg_name in bldg_names:
-        bldg_dir = os.path.join(sim_dir, bldg_name)
-        osm_file = os.path.join(bldg_dir, 'in.osm')
-        if os.path.isfile(osm_file):
-            osm.append(osm_file)
-        idf_file = os.path.join(bldg_dir, 'in.idf')
-        if os.path.isfile(idf_file):
-            idf.append(idf_file)
-        sql_file = os.path.join(bldg_dir, 'eplusout.sql')
-        if os.path.isfile(sql_file):
-            sql.append(sql_file)
-        zsz_file = os.path.join(bldg_dir, 'epluszsz.csv')
-        if os.path.isfile(zsz_file):
-            zsz.append(zsz_file)
-        rdd_file = os.path.join(bldg_dir, 'eplusout.rdd')
-        if os.path.isfile(rdd_file):
-            rdd.append(rdd_file)
-        html_file = os.path.join(bldg_dir, 'eplustbl.htm')
-        if os.path.isfile(html_file):
-            html.append(html_file)
-        err_file = os.path.join(bldg_dir, 'eplusout.err')
-        if os.path.isfile(err_file):
-            err.append(err_file)
+        # end the folder path with a separator so file names can be appended to it
+        bldg_dir = os.path.join(sim_dir, bldg_name) + os.sep
+        try:
+            bldg_files = os.listdir(bldg_dir)
+        except OSError:  # the building was not simulated
+            continue
+        for f_name in bldg_files:
+            if f_name in result_lists:
+                result_lists[f_name].append(bldg_dir + f_name)
 
     return osm, idf, sql, zsz, rdd, html, err
 
@@ -968,8 +984,9 @@ def _run_default_report_windows(feature_geojson, scenario_csv):
     batch_file = os.path.join(directory, 'run_default_report.bat')
     write_to_file(batch_file, batch, True)
     # run the batch file and return output files
-    os.system('"{}"'.format(batch_file))
-    result_folder = os.path.basename(scenario_csv).lower().replace('.csv', '')
+    process = subprocess.Popen('"{}"'.format(batch_file), env=PYTHON_ENV)
+    process.communicate()
+    result_folder = _scenario_result_folder(scenario_csv)
     run_folder = os.path.join(directory, 'run', result_folder)
     return os.path.join(run_folder, 'default_scenario_report.csv'), \
         os.path.join(run_folder, 'default_scenario_report.json')
@@ -993,13 +1010,10 @@ def _run_default_report_unix(feature_geojson, scenario_csv):
         'uo process --default -f "{}" -s "{}"'.format(
             folders.urbanopt_env_path, feature_geojson, scenario_csv)
     shell_file = os.path.join(directory, 'run_default_report.sh')
-    write_to_file(shell_file, shell, True)
-    # make the shell script executable using subprocess.check_call
-    # this is more reliable than native Python chmod on Mac
-    subprocess.check_call(['chmod', 'u+x', shell_file])
+    _write_executable(shell_file, shell)
     # run the shell script
     subprocess.call(shell_file)
-    result_folder = os.path.basename(scenario_csv).lower().replace('.csv', '')
+    result_folder = _scenario_result_folder(scenario_csv)
     run_folder = os.path.join(directory, 'run', result_folder)
     return os.path.join(run_folder, 'default_scenario_report.csv'), \
         os.path.join(run_folder, 'default_scenario_report.json')
@@ -1030,8 +1044,9 @@ def _run_reopt_windows(feature_geojson, scenario_csv, developer_key):
     batch_file = os.path.join(directory, 'run_reopt.bat')
     write_to_file(batch_file, batch, True)
     # run the batch file
-    os.system('"{}"'.format(batch_file))
-    result_folder = os.path.basename(scenario_csv).lower().replace('.csv', '')
+    process = subprocess.Popen('"{}"'.format(batch_file), env=PYTHON_ENV)
+    process.communicate()
+    result_folder = _scenario_result_folder(scenario_csv)
     return os.path.join(directory, 'run', result_folder)
 
 
@@ -1057,13 +1072,10 @@ def _run_reopt_unix(feature_geojson, scenario_csv, developer_key):
         'uo process --reopt-scenario -f "{}" -s "{}"'.format(
             folders.urbanopt_env_path, developer_key, feature_geojson, scenario_csv)
     shell_file = os.path.join(directory, 'run_reopt.sh')
-    write_to_file(shell_file, shell, True)
-    # make the shell script executable using subprocess.check_call
-    # this is more reliable than native Python chmod on Mac
-    subprocess.check_call(['chmod', 'u+x', shell_file])
+    _write_executable(shell_file, shell)
     # run the shell script
     subprocess.call(shell_file)
-    result_folder = os.path.basename(scenario_csv).lower().replace('.csv', '')
+    result_folder = _scenario_result_folder(scenario_csv)
     return os.path.join(directory, 'run', result_folder)
 
 
@@ -1112,7 +1124,8 @@ def _run_rnm_windows(feature_geojson, scenario_csv):
     batch_file = os.path.join(directory, 'run_rnm.bat')
     write_to_file(batch_file, batch, True)
     # run the batch file
-    os.system('"{}"'.format(batch_file))
+    process = subprocess.Popen('"{}"'.format(batch_file), env=PYTHON_ENV)
+    process.communicate()
     return directory
 
 
@@ -1136,10 +1149,7 @@ def _run_rnm_unix(feature_geojson, scenario_csv):
     shell = '#!/usr/bin/env bash\nsource "{}"\nuo rnm --feature "{}" -s-scenario ' \
         '"{}"'.format(folders.urbanopt_env_path, feature_geojson, scenario_csv)
     shell_file = os.path.join(directory, 'run_rnm.sh')
-    write_to_file(shell_file, shell, True)
-    # make the shell script executable using subprocess.check_call
-    # this is more reliable than native Python chmod on Mac
-    subprocess.check_call(['chmod', 'u+x', shell_file])
+    _write_executable(shell_file, shell)
     # run the shell script
     subprocess.call(shell_file)
     return directory
@@ -1231,14 +1241,9 @@ def _generate_modelica_unix(sys_param_json, feature_geojson, scenario_csv):
             folders.urbanopt_env_path, mbl_dir,
             uo_des_exe, sys_param_json, feature_geojson, modelica_dir)
     shell_file = os.path.join(directory, 'generate_modelica.sh')
-    write_to_file(shell_file, shell, True)
-    # make the shell script executable using subprocess.check_call
-    # this is more reliable than native Python chmod on Mac
-    subprocess.check_call(['chmod', 'u+x', shell_file])
+    _write_executable(shell_file, shell)
     # run the shell script
-    process = subprocess.Popen(
-        '"{}"'.format(shell_file), stderr=subprocess.PIPE, env=PYTHON_ENV, shell=True
-    )
+    process = subprocess.Popen([shell_file], stderr=subprocess.PIPE, env=PYTHON_ENV)
     result = process.communicate()
     stderr = result[1]
     return modelica_dir, stderr
@@ -1251,19 +1256,20 @@ def _add_water_heating_patch(modelica_dir):
         for bldg_dir in os.listdir(data_dir):
             mo_load_file = os.path.join(data_dir, bldg_dir, 'modelica.mos')
             if os.path.isfile(mo_load_file):
-                fixed_lines, fl_found = [], False
+                fixed_lines = []
                 with open(mo_load_file, 'r') as mlf:
-                    for line in mlf:
+                    for line in iter(mlf.readline, ''):
                         if line == '#Peak water heating load = 0 Watts\n':
                             nl = '#Peak water heating load = 1 Watts\n'
                             fixed_lines.append(nl)
-                        elif not fl_found and ';' in line:
+                        elif ';' in line:  # first line of data after the header
                             split_vals = line.split(';')
                             split_vals[-1] = '1.0\n'
                             fixed_lines.append(';'.join(split_vals))
-                            fl_found = True
+                            break
                         else:
                             fixed_lines.append(line)
+                    fixed_lines.append(mlf.read())  # rest of the data is unchanged
                 with open(mo_load_file, 'w') as mlf:
                     mlf.write(''.join(fixed_lines))
 
@@ -1344,14 +1350,9 @@ def _run_modelica_unix(modelica_project_dir):
     shell = '#!/usr/bin/env bash\n"{}" run-model "{}"'.format(
         uo_des_exe, modelica_project_dir)
     shell_file = os.path.join(directory, 'run_modelica.sh')
-    write_to_file(shell_file, shell, True)
-    # make the shell script executable using subprocess.check_call
-    # this is more reliable than native Python chmod on Mac
-    subprocess.check_call(['chmod', 'u+x', shell_file])
+    _write_executable(shell_file, shell)
     # run the shell script
-    process = subprocess.Popen(
-        '"{}"'.format(shell_file), stderr=subprocess.PIPE, env=PYTHON_ENV, shell=True
-    )
+    process = subprocess.Popen([shell_file], stderr=subprocess.PIPE, env=PYTHON_ENV)
     result = process.communicate()
     stderr = result[1]
     return results, stderr
@@ -1,6 +1,5 @@
 # coding=utf-8
 """Methods to write files for URBANopt simulation from a Model."""
-import sys
 import os
 import re
 import json
@@ -12,6 +11,9 @@ from ladybug.epw import EPW
 from honeybee.config import folders
 from honeybee.model import Model as hb_model
 
+# Pattern for characters that are not allowed in simulation folder names
+SIM_DIR_RE = re.compile(r'[^.A-Za-z0-9_-]')
+
 
 def model_to_urbanopt(
     model, location, point=Point2D(0, 0), shade_distance=None, use_multiplier=True,
@@ -106,7 +108,7 @@ def model_to_urbanopt(
     if folder is None:  # use the default simulation folder
         assert len(folders.default_simulation_folder) < 55, \
             tr_msg.format(folders.default_simulation_folder)
-        sim_dir = re.sub(r'[^.A-Za-z0-9_-]', '_', model.display_name)
+        sim_dir = SIM_DIR_RE.sub('_', model.display_name)
         folder = os.path.join(folders.default_simulation_folder, sim_dir)
         if len(folder) >= 60:
             tr_len = 58 - len(folders.default_simulation_folder)
@@ -140,6 +142,7 @@ def model_to_urbanopt(
     # prepare the folder into which honeybee Model JSONs will be written
     hb_model_folder = os.path.join(folder, 'hb_json')  # folder for honeybee JSONs
     preparedir(hb_model_folder)
+    hb_model_prefix = os.path.join(hb_model_folder, '')  # prefix for each JSON path
 
     # create GeoJSON dictionary
     geojson_dict = model.to_geojson_dict(location, point, tolerance=tolerance)
@@ -147,7 +150,7 @@ def model_to_urbanopt(
         if feature_dict['properties']['type'] == 'Building':
             bldg_id = feature_dict['properties']['id']
             feature_dict['properties']['detailed_model_filename'] = \
-                os.path.join(hb_model_folder, '{}.json'.format(bldg_id))
+                hb_model_prefix + bldg_id + '.json'
 
     # add the DES to the GeoJSON dictionary
     if des_loop is not None:
@@ -156,9 +159,8 @@ def model_to_urbanopt(
                 model.buildings, location, point, tolerance=tolerance)
             geojson_dict['features'].extend(des_features)
         sys_p_json = os.path.join(folder, 'system_params.json')
-        with open(sys_p_json, 'w') as fp:
-            des_dict = des_loop.to_des_param_dict(model.buildings, tolerance=tolerance)
-            json.dump(des_dict, fp, indent=2)
+        des_dict = des_loop.to_des_param_dict(model.buildings, tolerance=tolerance)
+        _write_json(sys_p_json, des_dict, indent=2)
         if conversion_factor is not None:
             des_loop.scale(1 / conversion_factor)
 
@@ -168,8 +170,8 @@ def model_to_urbanopt(
             model.buildings, location, point, tolerance=tolerance)
         geojson_dict['features'].extend(electric_features)
         electric_json = os.path.join(folder, 'electrical_database.json')
-        with open(electric_json, 'w') as fp:
-            json.dump(electrical_network.to_electrical_database_dict(), fp, indent=4)
+        elec_dict = electrical_network.to_electrical_database_dict()
+        _write_json(electric_json, elec_dict, indent=4)
         if conversion_factor is not None:
             electrical_network.scale(1 / conversion_factor)
 
@@ -190,13 +192,7 @@ def model_to_urbanopt(
 
     # write out the GeoJSON file
     feature_geojson = os.path.join(folder, '{}.geojson'.format(model.identifier))
-    if (sys.version_info < (3, 0)):  # we need to manually encode it as UTF-8
-        with open(feature_geojson, 'wb') as fp:
-            obj_str = json.dumps(geojson_dict, indent=4, ensure_ascii=False)
-            fp.write(obj_str.encode('utf-8'))
-    else:
-        with open(feature_geojson, 'w', encoding='utf-8') as fp:
-            obj_str = json.dump(geojson_dict, fp, indent=4, ensure_ascii=False)
+    _write_json(feature_geojson, geojson_dict, indent=4, ensure_ascii=False)
 
     # write out the honeybee Model JSONs from the model
     hb_model_jsons = []
@@ -212,14 +208,8 @@ def model_to_urbanopt(
             raise ValueError(error)
         model_dict = bldg_model.to_dict(triangulate_sub_faces=True)
         bldg_model.properties.energy.add_autocal_properties_to_dict(model_dict)
-        bld_path = os.path.join(hb_model_folder, '{}.json'.format(bldg_model.identifier))
-        if (sys.version_info < (3, 0)):  # we need to manually encode it as UTF-8
-            with open(bld_path, 'wb') as fp:
-                obj_str = json.dumps(model_dict, indent=4, ensure_ascii=False)
-                fp.write(obj_str.encode('utf-8'))
-        else:
-            with open(bld_path, 'w', encoding='utf-8') as fp:
-                obj_str = json.dump(model_dict, fp, indent=4, ensure_ascii=False)
+        bld_path = hb_model_prefix + bldg_model.identifier + '.json'
+        _write_json(bld_path, model_dict, ensure_ascii=False)
         hb_model_jsons.append(bld_path)
 
     return feature_geojson, hb_model_jsons, hb_models
@@ -284,7 +274,7 @@ def model_to_des(
     if folder is None:  # use the default simulation folder
         folder = os.path.join(
             folders.default_simulation_folder,
-            re.sub(r'[^.A-Za-z0-9_-]', '_', model.display_name)
+            SIM_DIR_RE.sub('_', model.display_name)
         )
     nukedir(folder, True)  # get rid of anything that exists in the folder already
     preparedir(folder)  # create the directory if it's not there
@@ -299,17 +289,13 @@ def model_to_des(
     scenario_matrix = [['Feature Id', 'Feature Name', 'Mapper Class']]
     hb_mapper = 'URBANopt::Scenario::HoneybeeMapper'
     for feature in geojson_dict['features']:
-        try:
-            if feature['properties']['type'] == 'Building':
-                props = feature['properties']
-                f_row = [props['id'], props['name'], hb_mapper]
-                scenario_matrix.append(f_row)
-        except KeyError:  # definitely not a building
-            pass
+        props = feature.get('properties')
+        if props is not None and props.get('type') == 'Building':
+            f_row = [props['id'], props['name'], hb_mapper]
+            scenario_matrix.append(f_row)
     scenario_csv = os.path.join(folder, 'honeybee_scenario.csv')
     with open(scenario_csv, 'w') as fp:
-        for row in scenario_matrix:
-            fp.write('{}\n'.format(','.join(row)))
+        fp.write(''.join('{}\n'.format(','.join(row)) for row in scenario_matrix))
 
     # write the Building loads into the scenario result folder
     scn_dir = os.path.join(folder, 'run', 'honeybee_scenario')
@@ -319,7 +305,8 @@ def model_to_des(
         mos_data = bldg.properties.energy.to_building_load_mos()
         bldg_dir = os.path.join(scn_dir, bldg.identifier)
         measure_dir = os.path.join(bldg_dir, '004_export_modelica_loads')
-        preparedir(measure_dir)
+        if not os.path.isdir(measure_dir):  # nukedir may have left it behind
+            os.makedirs(measure_dir)
         csv_path = os.path.join(measure_dir, 'building_loads.csv')
         json_path = os.path.join(bldg_dir, 'results.json')
         mos_path = os.path.join(measure_dir, 'modelica.mos')
@@ -342,9 +329,8 @@ def model_to_des(
     # copy the EPW to the project directory
     epw_f_name = os.path.split(epw_file)[-1]
     target_epw = os.path.join(folder, epw_f_name)
-    shutil.copy(epw_file, target_epw)
+    shutil.copyfile(epw_file, target_epw)
     # create a MOS file from the EPW
-    epw_obj = EPW(target_epw)
     mos_file = os.path.join(folder, epw_f_name.replace('.epw', '.mos'))
     epw_obj.to_mos(mos_file)
     # write the EPW path into the GeoJSON
@@ -359,24 +345,32 @@ def model_to_des(
             if 'soil' in g5_par and 'undisturbed_temp' in g5_par['soil']:
                 soil_par = g5_par['soil']
                 if soil_par['undisturbed_temp'] == 'Autocalculate':
-                    epw_obj = EPW(epw_file)
                     soil_par['undisturbed_temp'] = \
                         epw_obj.dry_bulb_temperature.average
 
     # write out the GeoJSON and system parameter files
     feature_geojson = os.path.join(folder, '{}.geojson'.format(model.identifier))
     system_parameters = os.path.join(folder, 'system_params.json')
-    if (sys.version_info < (3, 0)):  # we need to manually encode it as UTF-8
-        with open(feature_geojson, 'wb') as fp:
-            obj_str = json.dumps(geojson_dict, indent=4, ensure_ascii=False)
-            fp.write(obj_str.encode('utf-8'))
-        with open(system_parameters, 'wb') as fp:
-            obj_str = json.dumps(des_dict, indent=2, ensure_ascii=False)
-            fp.write(obj_str.encode('utf-8'))
-    else:
-        with open(feature_geojson, 'w', encoding='utf-8') as fp:
-            obj_str = json.dump(geojson_dict, fp, indent=4, ensure_ascii=False)
-        with open(system_parameters, 'w') as fp:
-            json.dump(des_dict, fp, indent=2)
+    _write_json(feature_geojson, geojson_dict, indent=4, ensure_ascii=False)
+    _write_json(system_parameters, des_dict, indent=2)
 
     return feature_geojson, scenario_csv, system_parameters
+
+
+def _write_json(file_path, json_obj, indent=None, ensure_ascii=True):
+    """Write a JSON-serializable object to a UTF-8 encoded file in a single write.
+
+    The text is encoded before it is written such that the same code works
+    in both Python 2 and Python 3.
+
+    Args:
+        file_path: The full path to the JSON file to be written.
+        json_obj: A JSON-serializable object (typically a dictionary).
+        indent: An optional integer for the indentation of the JSON. If None,
+            the JSON will be written without any indentation. (Default: None).
+        ensure_ascii: Boolean to note whether non-ASCII characters should be
+            escaped in the output. (Default: True).
+    """
+    obj_str = json.dumps(json_obj, indent=indent, ensure_ascii=ensure_ascii)
+    with open(file_path, 'wb') as fp:
+        fp.write(obj_str.encode('utf-8'))
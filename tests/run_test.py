@@ -1,7 +1,9 @@
 # coding=utf-8
 import pytest
 
-from dragonfly_energy.run import base_honeybee_osw
+from dragonfly_energy.run import base_honeybee_osw, _add_water_heating_patch, \
+    _write_executable, _output_urbanopt_files
+from dragonfly_energy.measure import MapperMeasure
 
 from dragonfly.model import Model
 from dragonfly.building import Building
@@ -22,6 +24,7 @@ from ladybug_geometry.geometry3d.plane import Plane
 from ladybug_geometry.geometry3d.face import Face3D
 
 import os
+import stat
 import json
 
 
@@ -105,3 +108,177 @@ def test_base_honeybee_osw():
 
     # clean up the files
     nukedir(sim_folder, True)
+
+
+def test_base_honeybee_osw_mapper_measure():
+    """Test the mapping of MapperMeasure arguments to the buildings of a geoJSON."""
+    buildings = []
+    for i in range(3):
+        pts = (Point3D(i * 20, 0, 0), Point3D(i * 20 + 10, 0, 0),
+               Point3D(i * 20 + 10, 10, 0), Point3D(i * 20, 10, 0))
+        room = Room2D('Office{}'.format(i), Face3D(pts), 3)
+        bldg = Building('OfficeBuilding{}'.format(i), [Story('Floor{}'.format(i), [room])])
+        bldg.properties.energy.set_all_room_2d_program_type(office_program)
+        buildings.append(bldg)
+    tree_canopy = ContextShade(
+        'TreeCanopy', [Face3D.from_regular_polygon(6, 6, Plane(o=Point3D(5, -10, 6)))])
+    model = Model('TestMapper', buildings, [tree_canopy])
+    location = Location('Boston', 'MA', 'USA', 42.366151, -71.019357)
+    sim_folder = './tests/simulation_mapper'
+    geojson, _, _ = model.to.urbanopt(model, location, folder=sim_folder)
+
+    measure_path = './tests/measure/edit_fraction_radiant_of_lighting_and_equipment'
+    measure = MapperMeasure(measure_path)
+    measure.arguments[0].value = [0.25, 0.5, 0.75]
+    measure.arguments[1].value = [0.1, 0.2, 0.3]
+    base_honeybee_osw(sim_folder, additional_mapper_measures=[measure])
+
+    with open(geojson, 'r') as gf:
+        geo_dict = json.load(gf)
+    bldg_props = [f['properties'] for f in geo_dict['features']
+                  if f['properties']['type'] == 'Building']
+    assert [p['lightsFractRad'] for p in bldg_props] == [0.25, 0.5, 0.75]
+    assert [p['equipFractRad'] for p in bldg_props] == [0.1, 0.2, 0.3]
+
+    measure.arguments[0].value = [0.25, 0.5]
+    with pytest.raises(ValueError):
+        base_honeybee_osw(sim_folder, additional_mapper_measures=[measure])
+
+    # clean up the files
+    nukedir(sim_folder, True)
+
+
+def test_base_honeybee_osw_modelica_steps():
+    """Test that Modelica steps already in a base OSW are run instead of duplicated."""
+    pts = (Point3D(0, 0, 0), Point3D(10, 0, 0), Point3D(10, 10, 0), Point3D(0, 10, 0))
+    room = Room2D('Office', Face3D(pts), 3)
+    bldg = Building('OfficeBuilding', [Story('OfficeFloor', [room])])
+    bldg.properties.energy.set_all_room_2d_program_type(office_program)
+    model = Model('TestModelica', [bldg])
+    location = Location('Boston', 'MA', 'USA', 42.366151, -71.019357)
+    sim_folder = './tests/simulation_modelica'
+    model.to.urbanopt(model, location, folder=sim_folder)
+
+    # write a system parameter file and a base OSW with a skipped Modelica step
+    sys_param_file = os.path.join(sim_folder, 'system_params.json')
+    with open(sys_param_file, 'w') as fp:
+        json.dump({'district_system': {}}, fp)
+    base_osw = os.path.join(sim_folder, 'base_workflow.osw')
+    base_steps = [
+        {'measure_dir_name': 'export_modelica_loads', 'arguments': {'__SKIP__': True}}
+    ]
+    with open(base_osw, 'w') as fp:
+        json.dump({'steps': base_steps}, fp)
+
+    # create the honeybee osw and check the Modelica steps
+    epw_file = './tests/epw/chicago.epw'
+    base_workflow = base_honeybee_osw(sim_folder, base_osw=base_osw, epw_file=epw_file)
+    with open(base_workflow, 'r') as osw_f:
+        osw_dict = json.load(osw_f)
+    for m_name in ('export_time_series_modelica', 'export_modelica_loads'):
+        steps = [s for s in osw_dict['steps'] if s['measure_dir_name'] == m_name]
+        assert len(steps) == 1
+        assert steps[0]['arguments']['__SKIP__'] is False
+
+    # clean up the files
+    nukedir(sim_folder, True)
+
+
+def test_add_water_heating_patch():
+    """Test the patching of the water heating load in Modelica load files."""
+    modelica_dir = './tests/modelica_patch'
+    bldg_dir = os.path.join(modelica_dir, 'Loads', 'Resources', 'Data', 'Building1')
+    os.makedirs(bldg_dir)
+    header = '#1\n#Peak space cooling load = 1000 Watts\n' \
+        '#Peak water heating load = 0 Watts\ndouble tab1(3,4)\n'
+    data = '0;1000;500;0\n3600;1000;500;0\n7200;1000;500;0\n'
+    mo_load_file = os.path.join(bldg_dir, 'modelica.mos')
+    with open(mo_load_file, 'w') as mlf:
+        mlf.write(header + data)
+
+    _add_water_heating_patch(modelica_dir)
+    with open(mo_load_file, 'r') as mlf:
+        lines = mlf.readlines()
+    assert lines[:4] == [
+        '#1\n', '#Peak space cooling load = 1000 Watts\n',
+        '#Peak water heating load = 1 Watts\n', 'double tab1(3,4)\n'
+    ]
+    assert lines[4:] == ['0;1000;500;1.0\n', '3600;1000;500;0\n', '7200;1000;500;0\n']
+
+    # clean up the files
+    nukedir(modelica_dir, True)
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='Requires a Unix file system.')
+def test_write_executable():
+    """Test the writing of executable shell scripts."""
+    sim_folder = './tests/simulation_executable'
+    os.makedirs(sim_folder)
+    shell_file = os.path.join(sim_folder, 'run_test.sh')
+    contents = '#!/usr/bin/env bash\necho "test"\n'
+
+    # check that a new file is created as an executable
+    _write_executable(shell_file, contents)
+    assert os.access(shell_file, os.X_OK)
+    with open(shell_file, 'r') as sf:
+        assert sf.read() == contents
+
+    # check that an unchanged file is not rewritten
+    os.utime(shell_file, (1000000000, 1000000000))
+    _write_executable(shell_file, contents)
+    assert os.stat(shell_file).st_mtime == 1000000000
+
+    # check that the execute permission is restored on an existing file
+    os.chmod(shell_file, 0o644)
+    _write_executable(shell_file, contents)
+    assert os.stat(shell_file).st_mode & stat.S_IXUSR
+
+    # clean up the files
+    nukedir(sim_folder, True)
+
+
+def test_output_urbanopt_files():
+    """Test the collection of simulation output files from an URBANopt folder."""
+    uo_folder = './tests/simulation_outputs'
+    sim_dir = os.path.join(uo_folder, 'run', 'honeybee_scenario')
+    os.makedirs(sim_dir)
+
+    # write a feature geoJSON with buildings in a different order than the folders
+    features = [
+        {'type': 'Feature', 'properties': {'type': 'Building', 'id': 'Bldg3'}},
+        {'type': 'Feature', 'properties': {'type': 'Site Origin'}},
+        {'type': 'Feature', 'properties': {'type': 'Building', 'id': 'Bldg1'}},
+        {'type': 'Feature', 'properties': {'type': 'Building', 'id': 'Bldg2'}}
+    ]
+    with open(os.path.join(uo_folder, 'TestOutputs.geojson'), 'w') as fp:
+        json.dump({'type': 'FeatureCollection', 'features': features}, fp)
+
+    # write the simulation files, leaving out some outputs and one building folder
+    all_files = ('in.osm', 'in.idf', 'eplusout.sql', 'epluszsz.csv',
+                 'eplusout.rdd', 'eplustbl.htm', 'eplusout.err')
+    bldg_files = {
+        'Bldg1': all_files,
+        'Bldg3': ('in.osm', 'eplusout.sql', 'eplusout.err', 'data_point_out.json')
+    }
+    for bldg, files in bldg_files.items():
+        bldg_dir = os.path.join(sim_dir, bldg)
+        os.makedirs(bldg_dir)
+        for f_name in files:
+            with open(os.path.join(bldg_dir, f_name), 'w') as fp:
+                fp.write('')
+    with open(os.path.join(sim_dir, 'default_scenario_report.csv'), 'w') as fp:
+        fp.write('')
+
+    # check that the files are found and that they follow the geoJSON order
+    osm, idf, sql, zsz, rdd, html, err = _output_urbanopt_files(uo_folder)
+    bldg1 = [os.path.join(sim_dir, 'Bldg1', f) for f in all_files]
+    assert osm == [os.path.join(sim_dir, 'Bldg3', 'in.osm'), bldg1[0]]
+    assert idf == [bldg1[1]]
+    assert sql == [os.path.join(sim_dir, 'Bldg3', 'eplusout.sql'), bldg1[2]]
+    assert zsz == [bldg1[3]]
+    assert rdd == [bldg1[4]]
+    assert html == [bldg1[5]]
+    assert err == [os.path.join(sim_dir, 'Bldg3', 'eplusout.err'), bldg1[6]]
+
+    # clean up the files
+    nukedir(uo_folder, True)